@@ -1,3 +1,5 @@
+import string
+
 # geometry project file identifier
 GEOMETRY_PROJECT = """\
 FTYP SONPROJ 15 ! Sonnet Project File
@@ -224,6 +226,13 @@ RESPONSE_DATA_FORMAT = ("{file_type} {deembed} {include_abs} {file_name} "
 RESPONSE_DATA_NETLIST_FORMAT = ("{file_type} NET={network} {deembed} {include_abs} "
                                 "{file_name} {include_comments} {precision} "
                                 "{parameter_type} {parameter_form} {ports}")
+FILE_TYPES = {'touchstone': 'TS', 'ts': 'TS', 'touchstone2': 'TOUCH2', 'touch2': 'TOUCH2',
+              'databank': 'DATA_BANK', 'data_bank': 'DATA_BANK', 'scompact': 'SC',
+              'sc': 'SC', 'spreadsheet': 'CSV', 'csv': 'CSV', 'cadance': 'CADANCE',
+              'mdif_s2p': 'MDIF', 'mdif': 'MDIF', 'mdif_ebridge': 'EBMDIF',
+              'ebmdif': 'EBMDIF'}
+PARAMETER_TYPES = frozenset(['S', 'Y', 'Z'])
+PARAMETER_FORMS = frozenset(['RI', 'MA', 'DB'])
 # parameter block for netlist project
 PARAMETER_NETLIST = """\
 VAR
@@ -249,6 +258,7 @@ END SUBDIV
 """
 REFERENCE_PLANES_FORMAT = "DRP1 {position} {plane_type} {length}"
 REFERENCE_PLANE_TYPES = {"fixed": "FIX", "FIX": "FIX", "linked": "LINK", "LINK": "LINK"}
+REFERENCE_PLANE_POSITIONS = frozenset(['left', 'right', 'top', 'bottom'])
 
 
 # quick start guide block for a geometry project
@@ -302,3 +312,34 @@ TRANSLATOR_FORMAT = """\
 {gbr_job_filename_type}
 {gbr_job_prefix}
 {gbr_units}"""
+
+
+def _compile(template):
+    """
+    Compile a format template into a function of one mapping that returns the same
+    string as template.format(**mapping) without parsing the template on every call.
+
+    :param template: format string with named replacement fields
+    :return: function(mapping) -> string
+    """
+    pieces = []
+    fields = {}
+    for literal, field, spec, conversion in string.Formatter().parse(template):
+        pieces.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field is None:
+            continue
+        # positional, attribute, index, or nested fields are left to str.format
+        if not field.isidentifier() or '{' in spec:
+            return lambda mapping: template.format(**mapping)
+        # the keys are passed in as defaults since f-string expressions can't hold quotes
+        key = fields.setdefault(field, "_{}".format(len(fields)))
+        pieces.append('{mapping[' + key + ']'
+                      + ('!' + conversion if conversion else '')
+                      + (':' + spec if spec else '') + '}')
+    defaults = "".join(", {}={!r}".format(key, field) for field, key in fields.items())
+    return eval("lambda mapping{}: f{!r}".format(defaults, "".join(pieces)))
+
+
+# compiled versions of every template above keyed by the template string
+FORMATTERS = {template: _compile(template) for name, template in list(globals().items())
+              if name.isupper() and isinstance(template, str)}
@@ -1,9 +1,145 @@
+import os
 import csv
-import copy
+import functools
 import numpy as np
+import dataclasses
 from matplotlib import colors
 from matplotlib import pyplot as plt
-from scipy.interpolate import interp2d
+from scipy.interpolate import RegularGridInterpolator
+try:
+    import pandas as pd
+except ImportError:  # pandas is optional and only speeds up loading the data
+    pd = None
+try:
+    from numba import njit
+except ImportError:  # numba is optional and only speeds up parsing the data
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _parse_field(buffer, start, stop):
+        """Parses buffer[start:stop] as a decimal number or returns nan if it is not one.
+        The value is exact to float64 rounding, which is only correctly rounded once it
+        is cast to float32."""
+        i = start
+        while i < stop and buffer[i] == 32:
+            i += 1
+        negative = False
+        if i < stop and (buffer[i] == 45 or buffer[i] == 43):  # '-' or '+'
+            negative = buffer[i] == 45
+            i += 1
+        # keep the first 18 significant digits, leading zeros only shift the exponent
+        mantissa = 0
+        exponent = 0
+        n_digits = 0
+        n_significant = 0
+        while i < stop and 48 <= buffer[i] <= 57:
+            if n_significant < 18:
+                mantissa = mantissa * 10 + (buffer[i] - 48)
+                if mantissa > 0:
+                    n_significant += 1
+            else:
+                exponent += 1
+            n_digits += 1
+            i += 1
+        if i < stop and buffer[i] == 46:  # '.'
+            i += 1
+            while i < stop and 48 <= buffer[i] <= 57:
+                if n_significant < 18:
+                    mantissa = mantissa * 10 + (buffer[i] - 48)
+                    exponent -= 1
+                    if mantissa > 0:
+                        n_significant += 1
+                n_digits += 1
+                i += 1
+        if n_digits == 0:
+            return np.nan
+        if i < stop and (buffer[i] == 101 or buffer[i] == 69):  # 'e' or 'E'
+            i += 1
+            negative_exponent = False
+            if i < stop and (buffer[i] == 45 or buffer[i] == 43):
+                negative_exponent = buffer[i] == 45
+                i += 1
+            if i == stop or not 48 <= buffer[i] <= 57:
+                return np.nan
+            power = 0
+            while i < stop and 48 <= buffer[i] <= 57:
+                if power < 100000:  # larger exponents over or underflow anyway
+                    power = power * 10 + (buffer[i] - 48)
+                i += 1
+            exponent += -power if negative_exponent else power
+        while i < stop and buffer[i] == 32:
+            i += 1
+        if i != stop:
+            return np.nan
+        if mantissa == 0:
+            value = 0.0
+        elif exponent < -400:
+            value = 0.0
+        elif exponent > 400:
+            value = np.inf
+        else:
+            # scale in two steps so that neither power of ten overflows
+            value = float(mantissa)
+            if exponent < 0:
+                half = -exponent // 2
+                value = value / 10.0 ** half / 10.0 ** (-exponent - half)
+            else:
+                value *= 10.0 ** exponent
+        return -value if negative else value
+
+    @njit(cache=True)
+    def _parse_rows(buffer, n_columns, out):
+        """Parses the comma separated rows in buffer into out and returns the row count.
+        Fields past n_columns are ignored and fields that are not numbers are nan."""
+        n = buffer.size
+        row = 0
+        column = 0
+        i = 0
+        while i < n:
+            if buffer[i] == 10 or buffer[i] == 13:  # end of a line
+                if column > 0:
+                    row += 1
+                    column = 0
+                i += 1
+                continue
+            start = i
+            while i < n and buffer[i] != 44 and buffer[i] != 10 and buffer[i] != 13:
+                i += 1
+            if column < n_columns and row < out.shape[0]:
+                out[row, column] = _parse_field(buffer, start, i)
+            column += 1
+            if i < n and buffer[i] == 44:  # ','
+                i += 1
+        if column > 0:
+            row += 1
+        return row
+
+    def _parse_grid(buffer, dtype):
+        """Parses the rows of a Sonnet csv grid from an array of its bytes. Every row ends
+        with a delimiter so the number of columns is the number of delimiters in the
+        first row."""
+        line_ends = np.flatnonzero(buffer == 10)
+        end = line_ends[0] if line_ends.size else buffer.size
+        n_columns = np.count_nonzero(buffer[:end] == 44)
+        n_rows = max(line_ends.size, np.count_nonzero(buffer == 13)) + 1
+        data = np.full((n_rows, n_columns), np.nan, dtype=dtype)
+        return data[:_parse_rows(buffer, n_columns, data)]
+
+
+def _bounded_slice(values, lower, upper):
+    """Returns the slice of the monotonic array values that lies in [lower, upper]."""
+    descending = values.size > 1 and values[-1] < values[0]
+    ascending_values = values[::-1] if descending else values
+    # compare at the precision of the data like the equivalent boolean mask would
+    lower, upper = np.array([lower, upper]).astype(values.dtype)
+    start = np.searchsorted(ascending_values, lower, side='left')
+    stop = max(start, np.searchsorted(ascending_values, upper, side='right'))
+    if descending:
+        # map the indices in the reversed array back onto the original order
+        return slice(values.size - stop, values.size - start)
+    return slice(start, stop)
 
 
 class Sweep:
@@ -11,71 +147,138 @@ class Sweep:
     pass
 
 
+@dataclasses.dataclass
+class _DensityHeader:
+    """Parsed values from the header of a Sonnet current density csv file."""
+    version: str
+    sonnet_file_path: str
+    sonnet_version: str
+    sonnet_file_name: str
+    frequency: float
+    level_string: str
+    level: int
+    position_unit_string: str
+    position_unit: float
+    dx: float
+    dy: float
+    area: float
+    area_unit_string: str
+    current_unit_string: str
+    drives: dict  # port number -> (voltage, phase) in file order
+
+    @classmethod
+    def from_rows(cls, header):
+        """Create the header from the csv rows of the file."""
+        position_unit_string = header[5][1]
+        if position_unit_string == "UM":
+            position_unit_string = "µm"
+        current_unit_string = header[7][2]
+        if current_unit_string == "Amps/Meter":
+            current_unit_string = "A/m"
+        drive = header[3]
+        drives = {int(cell[5:]): (float(drive[index + 2]), float(drive[index + 4]))
+                  for index, cell in enumerate(drive)
+                  if len(cell) > 4 and cell[:4] == 'Port'}
+        return cls(version=header[0][0], sonnet_file_path=header[0][2],
+                   sonnet_version=header[1][1], sonnet_file_name=header[1][3],
+                   frequency=float(header[2][1]), level_string=header[4][1],
+                   level=int(header[4][2]), position_unit_string=position_unit_string,
+                   position_unit=float(header[5][2]), dx=float(header[6][1]),
+                   dy=float(header[6][4]), area=float(header[6][9]),
+                   area_unit_string=header[6][10],
+                   current_unit_string=current_unit_string, drives=drives)
+
+
 class CurrentDensity:
     """Class for handling the current density output from Sonnet."""
-    def __init__(self, file_name=None, load_on_init=False):
+    # properties that are computed from the header once and then cached
+    _header_properties = ('version', 'sonnet_file_path', 'sonnet_version',
+                          'sonnet_file_name', 'frequency', 'level_string', 'level',
+                          'position_unit_string', 'position_unit', 'dx', 'dy', 'area',
+                          'area_unit_string', 'current_unit_string')
+
+    def __init__(self, file_name=None, load_on_init=False, cache=False,
+                 dtype=np.float32, compiled_parser=False):
         """
         :param file_name: .csv file name for the Sonnet current density output
         :param load_on_init: load data on object creation (True) or defer (False)
+        :param cache: keep a binary copy of the parsed data next to the .csv file
+                      (e.g. file_name + '.float32.npy', one per dtype) and load it
+                      read-only instead of parsing the .csv file again when it is up to
+                      date (True) or always parse the .csv file (False)
+        :param dtype: floating point type used to store the data. Sonnet only writes
+                      about seven significant digits so the default, numpy.float32, loses
+                      no precision while halving the memory used. Use numpy.float64 for
+                      double precision arithmetic.
+        :param compiled_parser: parse float32 data with a numba kernel (True) instead of
+                                pandas (False). The kernel is compiled the first time
+                                it is used, which takes seconds, so it only pays off
+                                when many files are loaded in the same process.
         """
         # check the inputs
         assert file_name is not None, "must specify a file_name"
         assert type(load_on_init) is bool, "load_on_init must be a boolean"
+        assert type(cache) is bool, "cache must be a boolean"
+        assert np.issubdtype(dtype, np.floating), "dtype must be a floating point type"
+        assert type(compiled_parser) is bool, "compiled_parser must be a boolean"
+        assert not compiled_parser or njit is not None, "compiled_parser requires numba"
 
         # save inputs and hidden parameters
         self.file_name = file_name
         self.load_on_init = load_on_init
+        self.cache = cache
+        self.dtype = np.dtype(dtype)
+        self.compiled_parser = compiled_parser
         self._header_lines = 9
 
+        self._data_loaded = False
+        self._header_loaded = False
+        self._header = None
+        self._header_offset = None
+        self._parsed_header = None
+        self._data = None
+        self._x_edges = None
+        self._y_edges = None
+
         # load or defer loading
         if load_on_init:
             self._load_data()
-            self._load_header()
-        else:
-            self._data_loaded = False
-            self._header_loaded = False
-            self._header = None
-            self._data = None
 
-    @property
+    @functools.cached_property
     def version(self):
         """Sonnet current density csv file format version."""
         self._check_header_loaded()
-        return self._header[0][0]
+        return self._parsed_header.version
 
-    @property
+    @functools.cached_property
     def sonnet_file_path(self):
         """Path to the Sonnet file used to generate the current density."""
         self._check_header_loaded()
-        return self._header[0][2]
+        return self._parsed_header.sonnet_file_path
 
-    @property
+    @functools.cached_property
     def sonnet_version(self):
         """Sonnet version used to generate the current density."""
         self._check_header_loaded()
-        return self._header[1][1]
+        return self._parsed_header.sonnet_version
 
-    @property
+    @functools.cached_property
     def sonnet_file_name(self):
         """Sonnet file name used to generate the current density."""
         self._check_header_loaded()
-        return self._header[1][3]
+        return self._parsed_header.sonnet_file_name
 
-    @property
+    @functools.cached_property
     def frequency(self):
         """Frequency [Hz] at which the current density data was evaluated."""
         self._check_header_loaded()
-        return float(self._header[2][1])
+        return self._parsed_header.frequency
 
     @property
     def ports(self):
         """Returns a list of Sonnet ports in the file"""
         self._check_header_loaded()
-        ports = []
-        for index, cell in enumerate(self._header[3]):
-            if len(cell) > 4 and cell[:4] == 'Port':
-                ports.append(int(cell[5:]))
-        return ports
+        return list(self._parsed_header.drives)
 
     def drive_voltage(self, port):
         """Voltage of the input sine wave in volts sent into the specified port during the
@@ -84,16 +287,7 @@ class CurrentDensity:
         :return: the voltage output (float)
         :raises ValueError if the specified port isn't in the file
         """
-        assert type(port) is int, "port must be an integer not {}".format(type(port))
-        self._check_header_loaded()
-        ports = []
-        for index, cell in enumerate(self._header[3]):
-            if len(cell) > 4 and cell[:4] == 'Port':
-                ports.append(int(cell[5:]))
-            if len(ports) > 0 and port == ports[-1]:
-                return float(self._header[3][index + 2])
-        raise ValueError("{} is not a valid port number. Use one of: {}"
-                         .format(port, ports))
+        return self._drive(port)[0]
 
     def drive_phase(self, port):
         """Phase of the input sine wave in degrees sent into the specified port during the
@@ -102,79 +296,64 @@ class CurrentDensity:
         :return: the voltage output unit (string)
         :raises ValueError if the specified port isn't in the file
         """
-        assert type(port) is int, "port must be an integer not {}".format(type(port))
-        self._check_header_loaded()
-        ports = []
-        for index, cell in enumerate(self._header[3]):
-            if len(cell) > 4 and cell[:4] == 'Port':
-                ports.append(int(cell[5:]))
-            if len(ports) > 0 and port == ports[-1]:
-                return float(self._header[3][index + 4])
-        raise ValueError("{} is not a valid port number. Use one of: {}"
-                         .format(port, ports))
+        return self._drive(port)[1]
 
-    @property
+    @functools.cached_property
     def level_string(self):
         """Returns the level string e.g. '1', '2a', '2b', '3', etc. Letter subscripts on
         correspond to thick metal model layers"""
         self._check_header_loaded()
-        return self._header[4][1]
+        return self._parsed_header.level_string
 
-    @property
+    @functools.cached_property
     def level(self):
         """Returns the level integer which is unique and may not correspond to the level
         selected in Sonnet if thick metal models are used."""
         self._check_header_loaded()
-        return int(self._header[4][2])
+        return self._parsed_header.level
 
-    @property
+    @functools.cached_property
     def position_unit_string(self):
         """Unit string for the x-y position of the data."""
         self._check_header_loaded()
-        if self._header[5][1] == "UM":
-            return "µm"
-        else:
-            return self._header[5][1]
+        return self._parsed_header.position_unit_string
 
-    @property
+    @functools.cached_property
     def position_unit(self):
         """Unit value in meters for the x-y position of the data.
          If the data is in microns, the output will be 1e-6."""
         self._check_header_loaded()
-        return float(self._header[5][2])
+        return self._parsed_header.position_unit
 
-    @property
+    @functools.cached_property
     def dx(self):
         """x grid step of the data in units of self.position_unit()."""
         self._check_header_loaded()
-        return float(self._header[6][1])
+        return self._parsed_header.dx
 
-    @property
+    @functools.cached_property
     def dy(self):
         """y grid step of the data in units of self.position_unit()."""
         self._check_header_loaded()
-        return float(self._header[6][4])
+        return self._parsed_header.dy
 
-    @property
+    @functools.cached_property
     def area(self):
         """Metal area in units of self.area_unit_string()."""
         self._check_header_loaded()
-        return float(self._header[6][9])
+        return self._parsed_header.area
 
-    @property
+    @functools.cached_property
     def area_unit_string(self):
         """Unit string of the self.area()."""
         self._check_header_loaded()
-        return self._header[6][10]
+        return self._parsed_header.area_unit_string
 
-    @property
+    @functools.cached_property
     def current_unit_string(self):
         """Unit string for the current density values."""
         self._check_header_loaded()
-        if self._header[7][2] == "Amps/Meter":
-            return "A/m"
-        else:
-            return self._header[7][2]
+        return self._parsed_header.current_unit_string
 
     @property
     def x_position(self):
@@ -199,30 +378,50 @@ class CurrentDensity:
         self._check_data_loaded()
         if power is None:
             return self._data[1:, 1:]
-
-        # calculate the rms power used for the simulation
-        voltages = []
-        for port in self.ports:
-            voltages.append(self.drive_voltage(port))
-        voltage = np.max(voltages)
-        power_data = voltage**2 / impedance / 2
-
-        # convert dBm to Watts
-        power = 1e-3 * 10**(power / 10)
-
-        return self._data[1:, 1:] * np.sqrt(power / power_data)
+        return self._data[1:, 1:] * self._power_scale(power, impedance)
 
     def current_density_function(self, power=None, impedance=50, **kwargs):
-        """Returns a scipy interp2d function over the current density
+        """Returns a function f(x, y) that linearly interpolates the current density on
+        its regular grid. Like interp2d, 1D x and y arrays are evaluated on the grid
+        they define and the output has shape (y.size, x.size), except that a single y
+        gives shape (x.size,) and scalar x and y give shape (1,). For many scattered
+        points, evaluate f.interpolator(np.column_stack((y_flat, x_flat))) directly.
         :param power: Power in dBm input into the input port. Uses the impedance parameter
                       to find the voltage. May not make sense if more than one port has a
                       nonzero input. Defaults to None and the input voltage in the file
                       is used.
         :param impedance: Impedance in ohms of the input port. It defaults to 50 ohms and
                           is not used if power is None.
-        :keyword **kwargs: keyword arguments to pass to interp2d"""
+        :keyword kind: interpolation method passed to RegularGridInterpolator. It
+                       defaults to 'linear'.
+        :keyword bounds_error: raise a ValueError for points outside of the grid. It
+                               defaults to False.
+        :keyword fill_value: value used outside of the grid. It defaults to 0."""
+        unexpected = kwargs.keys() - {'kind', 'bounds_error', 'fill_value'}
+        if unexpected:
+            message = "current_density_function() got unexpected keyword arguments {}"
+            raise TypeError(message.format(sorted(unexpected)))
         z = self.current_density(power=power, impedance=impedance)
-        return interp2d(self.x_position, self.y_position, z, **kwargs)
+        x = self.x_position
+        y = self.y_position
+        # the interpolator needs ascending grid vectors
+        if x[-1] < x[0]:
+            x, z = x[::-1], z[:, ::-1]
+        if y[-1] < y[0]:
+            y, z = y[::-1], z[::-1, :]
+        interpolator = RegularGridInterpolator(
+            (y, x), z, method=kwargs.get('kind', 'linear'),
+            bounds_error=kwargs.get('bounds_error', False),
+            fill_value=kwargs.get('fill_value', 0))
+
+        def function(x_new, y_new):
+            x_grid, y_grid = np.meshgrid(x_new, y_new)
+            z_new = interpolator((y_grid, x_grid))
+            # interp2d dropped the y dimension when it had a single value
+            return z_new[0] if len(z_new) == 1 else z_new
+
+        function.interpolator = interpolator
+        return function
 
     def trim_data(self, x_min=None, x_max=None, y_min=None, y_max=None):
         """Removes data outside of the bounds specified by x_min, x_max, y_min, and y_max.
@@ -247,18 +446,21 @@ class CurrentDensity:
 
         x = self.x_position
         y = self.y_position
-        current_density = self.current_density()
-        logic_x = np.logical_and(x >= x_min, x <= x_max)
-        logic_y = np.logical_and(y >= y_min, y <= y_max)
-
-        x = x[logic_x]
-        y = y[logic_y]
-        y = np.append(np.nan, y).reshape(y.size + 1, 1)
-        current_density = current_density[logic_y, :][:, logic_x]
-
-        data = np.vstack([x, current_density])
-        data = np.hstack([y, data])
+        # the grid is monotonic so the bounds select a contiguous block of the data
+        columns = _bounded_slice(x, x_min, x_max)
+        rows = _bounded_slice(y, y_min, y_max)
+        x = x[columns]
+        y = y[rows]
+
+        # fill the trimmed data with a single copy of the selected block
+        data = np.empty((y.size + 1, x.size + 1), dtype=self._data.dtype)
+        data[0, 0] = np.nan
+        np.copyto(data[0, 1:], x)
+        np.copyto(data[1:, 0], y)
+        np.copyto(data[1:, 1:], self.current_density()[rows, columns])
         self._data = data
+        self._x_edges = None
+        self._y_edges = None
 
     def plot_current(self, axis=None, power=None, impedance=50, scale=1, block=False):
         """Plots a density map of the current.
@@ -277,26 +479,20 @@ class CurrentDensity:
         """
         if axis is None:
             _, axis = plt.subplots()
-        sx = np.sign(self.x_position[-1] - self.x_position[-2])
-        sy = np.sign(self.y_position[-1] - self.y_position[-2])
-        x_position = np.concatenate([self.x_position - self.dx / 2 * sx,
-                                     np.array([self.x_position[-1] + self.dx / 2 * sx])])
-        y_position = np.concatenate([self.y_position - self.dy / 2 * sy,
-                                     np.array([self.y_position[-1] + self.dy / 2 * sy])])
-        x, y = np.meshgrid(x_position, y_position)
-        mappable = axis.pcolormesh(x, y, self.current_density(power=power,
-                                                              impedance=impedance),
+        x_edges, y_edges = self._cell_edges()
+        current_density = self.current_density(power=power, impedance=impedance)
+        mappable = axis.pcolormesh(x_edges, y_edges, current_density,
                                    norm=colors.PowerNorm(scale))
         axis.set_aspect('equal')
         axis.set_xlabel("position [{}]".format(self.position_unit_string))
         axis.set_ylabel("position [{}]".format(self.position_unit_string))
-        min_current = self.current_density(power=power, impedance=impedance).min()
-        max_current = self.current_density(power=power, impedance=impedance).max()
+        min_current = current_density.min()
+        max_current = current_density.max()
         ticks = np.linspace(min_current**scale, max_current**scale, 10)**(1 / scale)
         r = -int(np.floor(np.log10(ticks[1]))) + 1
-        ticks = np.round(ticks, r)
-        if ticks[-1] > max_current:
-            ticks[-1] = np.round(max_current - 10**-r, r)
+        np.round(ticks, r, out=ticks)
+        # rounding can push the top tick above the color bar range
+        np.copyto(ticks, np.round(max_current - 10.0**-r, r), where=ticks > max_current)
         color_bar = plt.colorbar(mappable, ax=axis, ticks=ticks)
         color_bar.set_label("current [{}]".format(self.current_unit_string),
                             va='bottom', rotation=270)
@@ -305,33 +501,125 @@ class CurrentDensity:
 
     def copy(self):
         """Returns a copy of the object"""
-        return copy.copy(self)
+        cls = type(self)
+        new = cls.__new__(cls)
+        new.__dict__.update(self.__dict__)
+        if self._data is not None:
+            new._data = self._data.view()
+        return new
 
     def deepcopy(self):
         """Returns a deep copy of the object"""
-        return copy.deepcopy(self)
+        new = self.copy()
+        if self._data is not None:
+            new._data = self._data.copy()
+        if self._header is not None:
+            new._header = [row[:] for row in self._header]
+            new._parsed_header = dataclasses.replace(
+                self._parsed_header, drives=dict(self._parsed_header.drives))
+        # the cell edges are recomputed from the copied data when needed
+        new._x_edges = None
+        new._y_edges = None
+        return new
+
+    def _power_scale(self, power, impedance):
+        # calculate the rms power used for the simulation
+        voltages = []
+        for port in self.ports:
+            voltages.append(self.drive_voltage(port))
+        voltage = np.max(voltages)
+        power_data = voltage**2 / impedance / 2
+
+        # convert dBm to Watts
+        power = 1e-3 * 10**(power / 10)
+
+        return np.sqrt(power / power_data)
+
+    def _cell_edges(self):
+        # the cell edges only depend on the grid so they are cached until it changes
+        if self._x_edges is None or self._y_edges is None:
+            x, y = self.x_position, self.y_position
+            sx = np.sign(x[-1] - x[-2])
+            sy = np.sign(y[-1] - y[-2])
+            self._x_edges = np.append(x - self.dx / 2 * sx, x[-1] + self.dx / 2 * sx)
+            self._y_edges = np.append(y - self.dy / 2 * sy, y[-1] + self.dy / 2 * sy)
+        return self._x_edges, self._y_edges
+
+    def _drive(self, port):
+        assert type(port) is int, "port must be an integer not {}".format(type(port))
+        self._check_header_loaded()
+        try:
+            return self._parsed_header.drives[port]
+        except KeyError:
+            raise ValueError("{} is not a valid port number. Use one of: {}"
+                             .format(port, self.ports))
 
     def _check_header_loaded(self):
         if not self._header_loaded:
             self._load_header()
 
     def _load_header(self):
-        header = []
-        with open(self.file_name, 'r') as csv_file:
-            reader = csv.reader(csv_file)
-            for _ in range(self._header_lines):
-                row = next(reader)
-                header.append(row)
-        self._header = header
-        self._header_loaded = True
+        self._load_all(load_data=False)
 
     def _check_data_loaded(self):
         if not self._data_loaded:
             self._load_data()
 
     def _load_data(self):
-        self._data = np.genfromtxt(self.file_name, delimiter=',',
-                                   skip_header=self._header_lines,
-                                   missing_values=["", "X Position ->"])
-        self._data = self._data[:, :-1]
+        self._load_all(load_data=True)
+
+    def _load_all(self, load_data=True):
+        # read the header and the data through the same file handle so that the file
+        # is only opened and scanned once
+        with open(self.file_name, 'r', newline='') as csv_file:
+            if self._header_loaded and load_data:
+                # jump straight to the data if the header has already been read
+                csv_file.seek(self._header_offset)
+            else:
+                lines = [csv_file.readline() for _ in range(self._header_lines)]
+                self._header_offset = csv_file.tell()
+                header = list(csv.reader(lines))
+                self._header = header
+                self._parsed_header = _DensityHeader.from_rows(header)
+                for name in self._header_properties:
+                    self.__dict__.pop(name, None)
+                self._header_loaded = True
+            if not load_data:
+                return
+            # data cached at a lower precision can not be used for a higher one
+            cache_file = "{}.{}.npy".format(self.file_name, self.dtype.name)
+            if self.cache and self._cache_valid(cache_file):
+                self._data = np.load(cache_file, mmap_mode='r')
+            else:
+                self._data = self._parse_data(csv_file, self.dtype,
+                                              self.compiled_parser)
+                if self.cache:
+                    try:
+                        np.save(cache_file, self._data)
+                    except OSError:  # the cache is optional so just parse next time
+                        pass
+        self._x_edges = None
+        self._y_edges = None
         self._data_loaded = True
+
+    def _cache_valid(self, cache_file):
+        return (os.path.isfile(cache_file) and
+                os.path.getmtime(cache_file) >= os.path.getmtime(self.file_name))
+
+    @staticmethod
+    def _parse_data(csv_file, dtype, compiled_parser=False):
+        if compiled_parser and dtype == np.float32:
+            # the kernel reads the bytes after the header straight from the file. It
+            # only rounds correctly to float32 so other types are parsed below.
+            buffer = np.fromfile(csv_file.name, dtype=np.uint8, offset=csv_file.tell())
+            return _parse_grid(buffer, dtype)
+        missing_values = ["", "X Position ->"]
+        if pd is not None:
+            # the C tokenizer is much faster than genfromtxt for large grids
+            data = pd.read_csv(csv_file, header=None, engine='c',
+                               na_values=missing_values, dtype=dtype).to_numpy()
+        else:
+            data = np.genfromtxt(csv_file, delimiter=',', missing_values=missing_values,
+                                 dtype=dtype)
+        # the last column is empty because each row ends with a delimiter
+        return np.ascontiguousarray(data[:, :-1])
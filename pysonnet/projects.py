@@ -1,13 +1,18 @@
 import os
+import copy
+import json
 import yaml
 import shlex
 import shutil
 import psutil
 import pathlib
 import logging
+import tempfile
+import threading
 import subprocess
 import numpy as np
 from datetime import datetime
+from collections.abc import MutableMapping
 import xml.etree.ElementTree as ET
 from xml.dom import minidom
 
@@ -15,6 +20,12 @@ from xml.dom import minidom
 import pysonnet.blocks as b
 from pysonnet.sonnet import test_sonnet
 
+# use the libyaml bindings when they are available since they are much faster
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
 log = logging.getLogger(__name__)
 log.addHandler(logging.NullHandler())
 
@@ -23,33 +34,277 @@ __version__ = '0.0.3'
 FILE_MISSING_MESSAGE = "run make_sonnet_file() or provide the 'file_path' argument before" \
                        " running the simulation"
 
+# large buffers cut the number of system calls for big project and configuration files
+_WRITE_BUFFER_SIZE = 1 << 20
+_READ_BUFFER_SIZE = 1 << 17
+
+# parsed package configuration files keyed by path with the file state they came from
+_configuration_cache = {}
+_configuration_cache_lock = threading.Lock()
+_package_directory = os.path.dirname(os.path.abspath(__file__))
+
+# configuration files shipped with the package and the one loaded by default
+_USER_CONFIGURATION_PATH = os.path.join(_package_directory, 'user_configuration.yaml')
+_DEFAULT_CONFIGURATION_PATH = os.path.join(_package_directory,
+                                           'default_configuration.yaml')
+_DEFAULT_LOAD_PATH = (_USER_CONFIGURATION_PATH
+                      if os.path.isfile(_USER_CONFIGURATION_PATH)
+                      else _DEFAULT_CONFIGURATION_PATH)
+
+# format of the date stored in the project header
+_DATE_FORMAT = '%m/%d/%Y %H:%M:%S'
+
 
-class Project(dict):
+def _read_configuration(load_path):
+    """
+    Return a copy of the configuration in a yaml file. The package configuration files
+    are only parsed again if they have changed since the last time they were read.
+    Other files are always parsed so that loading many projects does not keep them
+    all in memory.
+
+    :param load_path: path to the yaml configuration file
+    """
+    path = os.path.abspath(load_path)
+    if os.path.dirname(path) != _package_directory:
+        with open(path, "rb", buffering=_READ_BUFFER_SIZE) as file_handle:
+            return yaml.load(file_handle, Loader=_Loader)
+    status = os.stat(path)
+    # the inode changes when a save replaces the file
+    state = (status.st_mtime_ns, status.st_size, status.st_ino)
+    with _configuration_cache_lock:
+        cached_state, configuration = _configuration_cache.get(path, (None, None))
+        if cached_state != state:
+            configuration = _read_package_configuration(path, status)
+            _configuration_cache[path] = (state, configuration)
+    return copy.deepcopy(configuration)
+
+
+def _read_package_configuration(path, status):
+    """
+    Read one of the package configuration files. The yaml file is the source of truth,
+    but a json copy is kept next to it and used instead while it is up to date since
+    json is much faster to parse. The copy is only written when json gives back the
+    same configuration.
+
+    :param path: absolute path to the yaml configuration file
+    :param status: os.stat() result for the yaml configuration file
+    """
+    json_path = os.path.splitext(path)[0] + '.json'
+    try:
+        if os.stat(json_path).st_mtime_ns >= status.st_mtime_ns:
+            with open(json_path, "rb", buffering=_READ_BUFFER_SIZE) as file_handle:
+                return json.load(file_handle)
+    except (OSError, ValueError):  # missing or partially written json copy
+        pass
+    with open(path, "rb", buffering=_READ_BUFFER_SIZE) as file_handle:
+        configuration = yaml.load(file_handle, Loader=_Loader)
+    try:
+        text = json.dumps(configuration)
+    except (TypeError, ValueError):  # e.g. unquoted yaml dates are not json types
+        text = None
+    if text is None or json.loads(text) != configuration:
+        # json would not give back the same configuration (e.g. non-string keys)
+        log.debug("not caching the configuration '{}' as json".format(path))
+        return configuration
+    temporary_path = None
+    try:
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix='.json.tmp', dir=os.path.dirname(json_path))
+        with os.fdopen(descriptor, "w") as file_handle:
+            file_handle.write(text)
+        os.replace(temporary_path, json_path)
+    except OSError:  # the package directory may not be writable
+        log.debug("could not write the configuration cache '{}'".format(json_path))
+        if temporary_path is not None and os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    return configuration
+
+
+# messages for the frequency sweep arguments that a sweep type requires
+_F1_F2_MESSAGE = "'f1' and 'f2' must be defined for this sweep"
+_F1_MESSAGE = "'f1' must be defined for this sweep"
+_N_POINTS_MESSAGE = "'n_points' must be defined for this sweep"
+_FREQUENCY_LIST_MESSAGE = "'frequency_list' must be defined for this sweep"
+_S_PARAMETER_MESSAGE = "'s_parameter' must be defined for this sweep"
+
+
+def _linear_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert f1 is not None and f2 is not None, _F1_F2_MESSAGE
+    if f_step is not None and n_points is None:
+        return b.FORMATTERS[b.SWEEP_FORMAT]({'f1': f1, 'f2': f2, 'f_step': f_step})
+    elif f_step is None and n_points is not None:
+        return b.FORMATTERS[b.LSWEEP_FORMAT]({'f1': f1, 'f2': f2, 'n_points': n_points})
+    message = "one of 'f_step' or 'n_points' must be specified for a linear sweep"
+    raise ValueError(message)
+
+
+def _exponential_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert f1 is not None and f2 is not None, _F1_F2_MESSAGE
+    assert n_points is not None, _N_POINTS_MESSAGE
+    return b.FORMATTERS[b.ESWEEP_FORMAT]({'f1': f1, 'f2': f2, 'n_points': n_points})
+
+
+def _single_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert f1 is not None, _F1_MESSAGE
+    return b.FORMATTERS[b.STEP_FORMAT]({'f1': f1})
+
+
+def _list_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert frequency_list is not None, _FREQUENCY_LIST_MESSAGE
+    return b.FORMATTERS[b.LIST_FORMAT](
+        {'frequency_list': " ".join(map(str, frequency_list))})
+
+
+def _dc_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    if f1 is None:
+        return b.FORMATTERS[b.DC_FORMAT]({'f_calc': "AUTO", 'frequency': ''})
+    return b.FORMATTERS[b.DC_FORMAT]({'f_calc': "MAN", 'frequency': f1})
+
+
+def _abs_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert f1 is not None and f2 is not None, _F1_F2_MESSAGE
+    return b.FORMATTERS[b.ABS_FORMAT]({'f1': f1, 'f2': f2})
+
+
+def _abs_min_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert f1 is not None and f2 is not None, _F1_F2_MESSAGE
+    assert s_parameter is not None, _S_PARAMETER_MESSAGE
+    return b.FORMATTERS[b.ABS_MIN_FORMAT]({'s_parameter': s_parameter, 'f1': f1,
+                                           'f2': f2})
+
+
+def _abs_max_sweep(f1, f2, n_points, f_step, frequency_list, s_parameter):
+    assert f1 is not None and f2 is not None, _F1_F2_MESSAGE
+    assert s_parameter is not None, _S_PARAMETER_MESSAGE
+    return b.FORMATTERS[b.ABS_MAX_FORMAT]({'s_parameter': s_parameter, 'f1': f1,
+                                           'f2': f2})
+
+
+# functions that format the sweep line for each sweep type of add_frequency_sweep()
+_SWEEP_BUILDERS = {'linear': _linear_sweep, 'exponential': _exponential_sweep,
+                   'single': _single_sweep, 'list': _list_sweep, 'dc': _dc_sweep,
+                   'abs': _abs_sweep, 'abs min': _abs_min_sweep,
+                   'abs max': _abs_max_sweep}
+
+
+class _Section(dict):
+    """
+    Dictionary holding one section of a project. It remembers the Sonnet file blocks
+    formatted from it until one of its entries is set or removed. Changes made inside
+    an entry are not seen, so sections with line entries are never remembered.
+    """
+    __slots__ = ('blocks',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocks = {}
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.blocks.clear()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.blocks.clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self.blocks.clear()
+
+    def pop(self, *args):
+        self.blocks.clear()
+        return super().pop(*args)
+
+    def popitem(self):
+        self.blocks.clear()
+        return super().popitem()
+
+    def setdefault(self, key, default=None):
+        self.blocks.clear()
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.blocks.clear()
+
+
+class Project(MutableMapping):
     """
     Abstract base class for the Geometry and Netlist Projects. It should not be
     instantiated.
 
     :param load_path: path to the yaml file for this project if it was saved (optional)
     """
+    __slots__ = ('_data', 'project_file_path', 'file_name', 'port')
+    # (template, section) pairs for each block of the Sonnet file, set by subclasses
+    file_blocks = ()
+    # entries kept as lists of lines that are joined when the Sonnet file is made and
+    # whether their last line also ends with a line separator
+    line_entries = {'frequency': {'sweeps': True},
+                    'output_file': {'response_data': True}}
+    # names of the configuration sections that a project may contain
+    sections = frozenset(['sonnet', 'dimensions', 'frequency', 'geometry', 'control',
+                          'optimization', 'parameter_sweep', 'output_file',
+                          'parameter_netlist', 'circuit', 'subdivider',
+                          'quick_start_guide', 'component_data_files', 'translators'])
+
     def __init__(self, load_path=None):
-        super().__init__()
+        self._data = {}
         self.project_file_path = None
-        self.file_name = file_name
-        self.sections = ['sonnet', 'dimensions', 'frequency', 'geometry', 'control',
-                         'optimization', 'parameter_sweep', 'output_file',
-                         'parameter_netlist', 'circuit', 'subdivider',
-                         'quick_start_guide', 'component_data_files', 'translators']
+        self.file_name = None
         self.port = ['capacitance', 'inductance', 'number', 'phase', 'reactance',
                      'resistance','voltage']
 
-        if load_path is not None:
-            self.load(load_path)
-        else:
-            directory = os.path.dirname(__file__)
-            load_path = os.path.join(directory, 'user_configuration.yaml')
-            if not os.path.isfile(load_path):
-                load_path = os.path.join(directory, 'default_configuration.yaml')
-            self.load(load_path)
+        self.load(load_path if load_path is not None else _DEFAULT_LOAD_PATH)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, self._data)
+
+    def __copy__(self):
+        # the copy gets its own sections and lists of lines so that setting an entry or
+        # adding a line does not change this project
+        project = type(self).__new__(type(self))
+        for name in Project.__slots__:
+            setattr(project, name, copy.copy(getattr(self, name)))
+        project._data = {name: copy.copy(values) for name, values in self._data.items()}
+        for section, keys in self.line_entries.items():
+            values = project._data.get(section)
+            for key in keys:
+                if values is not None and isinstance(values.get(key), list):
+                    values[key] = list(values[key])
+        return project
+
+    def __deepcopy__(self, memo):
+        project = type(self).__new__(type(self))
+        memo[id(self)] = project
+        for name in Project.__slots__:
+            setattr(project, name, copy.deepcopy(getattr(self, name), memo))
+        return project
 
     def make_sonnet_file(self, file_path):
         """
@@ -59,31 +314,111 @@ class Project(dict):
         """
         raise NotImplementedError
 
+    def _format_blocks(self):
+        """
+        Format each block of the Sonnet file. The blocks are written one after another
+        so they are never concatenated into one large string. Blocks of sections that
+        have not changed since they were last formatted are reused.
+        """
+        line_entries = self.line_entries
+        blocks = []
+        for template, section in self.file_blocks:
+            values = self[section]
+            # line entries are lists that can be edited without the section noticing
+            if isinstance(values, _Section) and section not in line_entries:
+                block = values.blocks.get(template)
+                if block is None:
+                    block = self._format_block(template, section, values)
+                    values.blocks[template] = block
+            else:
+                block = self._format_block(template, section, values)
+            blocks.append(block)
+        return blocks
+
+    def _format_block(self, template, section, values):
+        """
+        Format one block of the Sonnet file.
+
+        :param template: block template from pysonnet.blocks
+        :param section: name of the section used to format the block
+        :param values: dictionary of the section values
+        :return: formatted block string
+        """
+        if section in self.line_entries:
+            values = dict(values)
+            for key, terminated in self.line_entries[section].items():
+                lines = values[key]
+                if isinstance(lines, str):  # set as one string through the dictionary
+                    lines = lines.splitlines()
+                values[key] = os.linesep.join(lines) + (os.linesep if terminated and lines
+                                                        else '')
+        return b.FORMATTERS[template](values)
+
+    def _add_line(self, section, key, line):
+        """
+        Append a line to a multi-line entry of one of the project sections.
+
+        :param section: name of the section holding the entry
+        :param key: name of the entry in the section
+        :param line: string to add without the line separator
+        """
+        values = self[section]
+        if isinstance(values[key], str):  # set as one string through the dictionary
+            values[key] = values[key].splitlines()
+        values[key].append(line)
+
     def load(self, load_path):
         log.debug("loading configuration from '{}'".format(load_path))
-        self.clear()
+        self._data.clear()
         # load configuration
-        with open(load_path, "r") as file_handle:
-            configuration = yaml.load(file_handle, Loader=yaml.FullLoader)
-        for block in configuration.keys():
-            if block not in self.sections:
-                message = "{} is an unrecognized configuration section"
-                raise ValueError(message.format(block))
+        configuration = _read_configuration(load_path)
+        unknown = configuration.keys() - self.sections
+        if unknown:
+            block = next(block for block in configuration if block in unknown)
+            message = "{} is an unrecognized configuration section"
+            raise ValueError(message.format(block))
         # add configuration to the object
-        self.update(configuration)
+        self._data.update((name, _Section(values))
+                          for name, values in configuration.items())
+        # entries edited one line at a time are kept as lists of lines
+        for section, keys in self.line_entries.items():
+            values = self._data.get(section, {})
+            for key in keys:
+                if isinstance(values.get(key), str):
+                    values[key] = values[key].splitlines()
+        sonnet = self['sonnet']
         # add date if it doesn't exist
-        if self['sonnet']['date'] == '':
-            self['sonnet']['date'] = datetime.now().strftime('%m/%d/%Y %H:%M:%S')
+        if sonnet['date'] == '':
+            sonnet['date'] = datetime.now().strftime(_DATE_FORMAT)
         # add pysonnet version if it doesn't exist
-        if self['sonnet']['pysonnet_version'] == '':
-            self['sonnet']['pysonnet_version'] = __version__
+        if sonnet['pysonnet_version'] == '':
+            sonnet['pysonnet_version'] = __version__
         log.debug("configuration loaded")
 
     def save(self, save_path):
         log.debug("saving current configuration to '{}'".format(save_path))
-        self['sonnet']['date'] = datetime.now().strftime('%m/%d/%Y %H:%M:%S')
-        with open(save_path) as file_handle:
-            yaml.dump(dict(self), file_handle, default_flow_style=False)
+        self['sonnet']['date'] = datetime.now().strftime(_DATE_FORMAT)
+        # write to a temporary file next to the target and move it into place so
+        # that an interrupted save never leaves a truncated configuration behind
+        directory = os.path.dirname(os.path.abspath(save_path))
+        file_descriptor, temporary_path = tempfile.mkstemp(suffix='.yaml.tmp',
+                                                           dir=directory)
+        try:
+            with os.fdopen(file_descriptor, "w",
+                           buffering=_WRITE_BUFFER_SIZE) as file_handle:
+                # the safe dumper only represents plain dictionaries
+                configuration = {name: dict(values)
+                                 for name, values in self._data.items()}
+                yaml.dump(configuration, file_handle, Dumper=_Dumper,
+                          default_flow_style=False)
+            try:
+                shutil.copymode(save_path, temporary_path)
+            except OSError:  # new file
+                os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, save_path)
+        except BaseException:
+            os.remove(temporary_path)
+            raise
         log.debug("configuration saved")
 
     def set_analysis(self, analysis_type):
@@ -127,11 +462,12 @@ class Project(dict):
         if custom:
             options += custom
             log.debug("'{}' custom option selected".format(custom))
+        control = self['control']
         # add the options to the project
-        self['control']['options'] = options
+        control['options'] = options
         # add other options
-        self['control']['q_accuracy'] = "Y" if q_accuracy else "N"
-        self['control']['res_detection'] = "Y" if resonance_detection else "N"
+        control['q_accuracy'] = "Y" if q_accuracy else "N"
+        control['res_detection'] = "Y" if resonance_detection else "N"
         log.debug("q factor accuracy {}".format("on" if q_accuracy else "off"))
 
     def run(self, analysis_type=None, file_path=None, options='-v',
@@ -148,9 +484,10 @@ class Project(dict):
         :param file_path: path where the Sonnet file will be saved (optional)
             This parameter is optional if a Sonnet file has already been made and is
             consistent with the current project state.
-        :param options: extra command line options to pass to Sonnet em
-            Valid options are given on page 414 of the sonnet_users_guide.pdf. Verbose
-            is turned on by default and the output is sent to the program log.
+        :param options: extra command line options to pass to Sonnet em as a string or
+            a list of arguments. Valid options are given on page 414 of the
+            sonnet_users_guide.pdf. Verbose is turned on by default and the output is
+            sent to the program log.
         :param external_frequency_file: path to the frequency control file (optional)
         """
         # check analysis_type
@@ -160,8 +497,8 @@ class Project(dict):
             message = "an analysis has not been selected yet"
             assert self['control']['analysis_type'], message
         message = "add a sweep to the project before running"
-        assert (self['frequency']['sweeps'] != '' or
-                self['parameter_sweeps']['parameter_sweep'] != '' or
+        assert (self['frequency']['sweeps'] or
+                self['parameter_sweep']['parameter_sweep'] != '' or
                 self['optimization']['optimization_goals'] != ''), message
 
         # check to make sure there is a project file to run
@@ -169,29 +506,35 @@ class Project(dict):
             self.make_sonnet_file(file_path)
         if self.project_file_path is None:
             raise ValueError(FILE_MISSING_MESSAGE)
+        sonnet = self['sonnet']
         # check to make sure that sonnet has been configured
-        if self['sonnet']["sonnet_path"] == '':
+        if sonnet["sonnet_path"] == '':
             raise ValueError("configure sonnet before running")
         # collect the command to run
-        command = [os.path.join(self['sonnet']["sonnet_path"], "bin", "em")]
-        if options:
-            command.append(options)
+        command = [os.path.join(sonnet["sonnet_path"], "bin", "em")]
+        if isinstance(options, str):
+            # backslashes in Windows paths are not escape characters
+            options = shlex.split(options, posix=(os.name != 'nt'))
+        command.extend(options or [])
         command.append(self.project_file_path)
         if external_frequency_file:
             command.append(external_frequency_file)
         log.debug("running a(n) {}".format(analysis_type))
         # run the command
-        with psutil.Popen(command, stdout=subprocess.PIPE,
-                          stderr=subprocess.PIPE) as process:
-            while True:
-                output = process.stdout.readline().decode('utf-8').strip()
-                error = process.stderr.readline().decode('utf-8').strip()
-                if not output and not error and process.poll() is not None:
-                    break
+        if not log.isEnabledFor(logging.INFO):
+            # nothing would be logged so let the operating system discard the output
+            with psutil.Popen(command, stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL) as process:
+                process.wait()
+            return
+        # stderr is merged into stdout so that a single pipe is drained line by line
+        with psutil.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          encoding='utf-8', errors='replace', bufsize=1) as process:
+            for line in process.stdout:
+                output = line.strip()
                 if output:
                     log.info(output)
-                if error:
-                    log.error(error)
+            process.wait()
 
 
     def locate_sonnet(self, sonnet_path):
@@ -201,11 +544,12 @@ class Project(dict):
         :param sonnet_path: path to the Sonnet program
         """
         version, license_id = test_sonnet(sonnet_path)
-        self['sonnet']['sonnet_path'] = sonnet_path
+        sonnet = self['sonnet']
+        sonnet['sonnet_path'] = sonnet_path
         log.debug("sonnet path set to '{}'".format(sonnet_path))
-        self['sonnet']['version'] = version
+        sonnet['version'] = version
         log.debug("sonnet version to '{}'".format(version))
-        self['sonnet']['license_id'] = license_id
+        sonnet['license_id'] = license_id
         log.debug("license id set to '{}'".format(license_id))
 
     def add_frequency_sweep(self, sweep_type, **kwargs):
@@ -254,12 +598,6 @@ class Project(dict):
         f_step = kwargs.pop('f_step', None)
         frequency_list = kwargs.pop('frequency_list', None)
         s_parameter = kwargs.pop('s_parameter', None)
-        # define some messages to be used throughout the function
-        f1_f2_message = "'f1' and 'f2' must be defined for this sweep"
-        f1_message = "'f1' must be defined for this sweep"
-        n_points_message = "'n_points' must be defined for this sweep"
-        frequency_list_message = "'frequency_list' must be defined for this sweep"
-        s_parameter_message = "'s_parameter' must be defined for this sweep"
         # type check the input parameters
         type_message = "'{}' parameter must be of type '{}'"
         if f1 is not None:
@@ -274,62 +612,31 @@ class Project(dict):
         if frequency_list is not None:
             assert isinstance(frequency_list, (tuple, list)), \
                 type_message.format('frequency_list', 'list')
-            for frequency in frequency_list:
-                message = "each frequency in 'frequency_list' must be a float"
-                assert isinstance(frequency, (int, float)), message
+            # check every frequency at once instead of one element at a time
+            message = "each frequency in 'frequency_list' must be a float"
+            try:
+                frequencies = np.asarray(frequency_list)
+            except (TypeError, ValueError):  # e.g. nested lists of different lengths
+                raise AssertionError(message)
+            assert frequencies.ndim == 1 and frequencies.dtype.kind in 'iuf', message
         if s_parameter is not None:
             assert isinstance(s_parameter, str), type_message.format('s_parameter', 'str')
         # format the sweep string depending on sweep type
-        if sweep_type == 'linear':
-            assert f1 is not None and f2 is not None, f1_f2_message
-            if f_step is not None and n_points is None:
-                sweep = b.SWEEP_FORMAT.format(f1=f1, f2=f2, f_step=f_step)
-            elif f_step is None and n_points is not None:
-                sweep = b.LSWEEP_FORMAT.format(f1=f1, f2=f2, n_points=n_points)
-            else:
-                message = ("one of 'f_step' or 'n_points' must be specified for a linear "
-                           "sweep")
-                raise ValueError(message)
-        elif sweep_type == 'exponential':
-            assert f1 is not None and f2 is not None, f1_f2_message
-            assert n_points is not None, n_points_message
-            sweep = b.ESWEEP_FORMAT.format(f1=f1, f2=f2, n_points=n_points)
-        elif sweep_type == 'single':
-            assert f1 is not None, f1_message
-            sweep = b.STEP_FORMAT.format(f1=f1)
-        elif sweep_type == 'list':
-            assert frequency_list is not None, frequency_list_message
-            sweep = b.LIST_FORMAT
-            for frequency in frequency_list:
-                sweep.append(str(frequency) + ' ')
-        elif sweep_type == 'dc':
-            if f1 is None:
-                sweep = b.DC_FORMAT.format(fcalc="AUTO", frequency='')
-            else:
-                sweep = b.DC_FORMAT.format(fcalc="MAN", frequency=f1)
-        elif sweep_type == 'abs':
-            assert f1 is not None and f2 is not None, f1_f2_message
-            sweep = b.ABS_FORMAT.format(f1=f1, f2=f2)
-        elif sweep_type == 'abs min':
-            assert f1 is not None and f2 is not None, f1_f2_message
-            assert s_parameter is not None, s_parameter_message
-            sweep = b.ABS_MIN_FORMAT.format(s_parameter=s_parameter, f1=f1, f2=f2)
-        elif sweep_type == 'abs max':
-            assert f1 is not None and f2 is not None, f1_f2_message
-            assert s_parameter is not None, s_parameter_message
-            sweep = b.ABS_MAX_FORMAT.format(s_parameter=s_parameter, f1=f1, f2=f2)
-        else:
+        try:
+            builder = _SWEEP_BUILDERS[sweep_type]
+        except KeyError:
             message = ("'sweep_type' must be one of the following: 'linear', "
                        "'exponential', 'single', 'list', 'dc', 'abs', 'abs min', "
                        "or 'abs max'")
             raise ValueError(message)
+        sweep = builder(f1, f2, n_points, f_step, frequency_list, s_parameter)
         # add the sweep to the project
-        self['frequency']['sweeps'] += sweep + os.linesep
+        self._add_line('frequency', 'sweeps', sweep)
         log.debug("{} frequency sweep added".format(sweep_type))
 
     def clear_frequency_sweeps(self):
         """Removes all added frequency sweeps from the project."""
-        self['frequency']['sweeps'] = ''
+        self['frequency']['sweeps'] = []
         log.debug("all frequency sweeps removed")
 
     def add_parameter_sweep(self):
@@ -387,25 +694,26 @@ class GeometryProject(Project):
     """
                 
     
+    __slots__ = ()
+    line_entries = {'geometry': {'metals': False, 'reference_planes': True},
+                    **Project.line_entries}
+    # file blocks in the order they are written and the section that formats each
+    file_blocks = ((b.GEOMETRY_PROJECT, 'sonnet'), (b.HEADER, 'sonnet'),
+                   (b.DIMENSIONS, 'dimensions'), (b.GEOMETRY, 'geometry'),
+                   (b.FREQUENCY, 'frequency'), (b.CONTROL, 'control'),
+                   (b.OPTIMIZATION, 'optimization'),
+                   (b.PARAMETER_SWEEP, 'parameter_sweep'), (b.OUTPUT_FILE, 'output_file'),
+                   (b.SUBDIVIDER, 'subdivider'),
+                   (b.QUICK_START_GUIDE, 'quick_start_guide'),
+                   (b.COMPONENT_DATA_FILES, 'component_data_files'),
+                   (b.TRANSLATORS, 'translators'))
+
     def make_sonnet_file(self, file_path, clean=True):
         # convert the project format to the file format
-        file_string = (b.GEOMETRY_PROJECT.format(**self['sonnet']) +
-                       b.HEADER.format(**self['sonnet']) +
-                       b.DIMENSIONS.format(**self['dimensions']) +
-                       b.GEOMETRY.format(**self['geometry']) +
-                       b.FREQUENCY.format(**self['frequency']) +
-                       b.CONTROL.format(**self['control']) +
-                       b.OPTIMIZATION.format(**self['optimization']) +
-                       b.PARAMETER_SWEEP.format(**self['parameter_sweep']) +
-                       b.OUTPUT_FILE.format(**self['output_file']) +
-                       b.SUBDIVIDER.format(**self['subdivider']) +
-                       b.QUICK_START_GUIDE.format(**self['quick_start_guide']) +
-                       b.COMPONENT_DATA_FILES.format(**self['component_data_files']) +
-                       b.TRANSLATORS.format(**self['translators']))
-
+        blocks = self._format_blocks()
         log.debug("saving geometry project to '{}'".format(file_path))
-        with open(file_path, "w") as file_handle:
-            file_handle.write(file_string)
+        with open(file_path, "w", buffering=_WRITE_BUFFER_SIZE) as file_handle:
+            file_handle.writelines(blocks)
         self.project_file_path = file_path
         folder = os.path.join(os.path.dirname(self.project_file_path), 'sondata')
         if not os.path.isdir(folder):
@@ -466,7 +774,8 @@ class GeometryProject(Project):
 
         frequency = str(int(frequency))
 
-        if self['geometry']['x_cells2'] is None:
+        geometry = self['geometry']
+        if geometry['x_cells2'] is None:
             missing_setup_box = 'run setup_box() method for cell sizes'
             raise ValueError(missing_setup_box)
 
@@ -475,7 +784,7 @@ class GeometryProject(Project):
         JXY_Export = ET.SubElement(JXY_Export_Set, "JXY_Export", Filename=self.file_name +'.csv', Label=son_label)
         ET.SubElement(JXY_Export, "Region", Style=region_style)
         ET.SubElement(JXY_Export, "Levels", Stop=levels_stop, Range='Some', Start=levels_start)
-        ET.SubElement(JXY_Export, "Grid", XStep=self['geometry']['x_cells2'], YStep=self['geometry']['y_cells2'])
+        ET.SubElement(JXY_Export, "Grid", XStep=geometry['x_cells2'], YStep=geometry['y_cells2'])
         ET.SubElement(JXY_Export, "Measurement", Complex=measurement_complex, Type=measurement_type)
         Drive = ET.SubElement(JXY_Export, "Drive")
 
@@ -539,10 +848,10 @@ class GeometryProject(Project):
         """
         # check position parameter
         message = "valid values for the position are 'left', 'right', 'top', and 'bottom'"
-        assert position in ['left', 'right', 'top', 'bottom'], message
+        assert position in b.REFERENCE_PLANE_POSITIONS, message
         # check type parameter
         message = "valid values for the plane_type are 'fixed' and 'linked'"
-        assert plane_type in b.REFERENCE_PLANE_TYPES.keys(), message
+        assert plane_type in b.REFERENCE_PLANE_TYPES, message
         # choose type
         if b.REFERENCE_PLANE_TYPES[plane_type] == "FIX":
             # check length
@@ -551,13 +860,13 @@ class GeometryProject(Project):
             message = "length parameter must be a float or an int"
             assert isinstance(length, (float, int)), message
             # format the plane
-            plane = b.REFERENCE_PLANES_FORMAT.format(
-                position=position, plane_type=b.REFERENCE_PLANE_TYPES[plane_type],
-                length=length)
+            plane = b.FORMATTERS[b.REFERENCE_PLANES_FORMAT](
+                {'position': position, 'plane_type': b.REFERENCE_PLANE_TYPES[plane_type],
+                 'length': length})
         else:
             raise NotImplementedError
         # add the reference plane to the geometry
-        self['geometry']['reference_planes'] += plane + os.linesep
+        self._add_line('geometry', 'reference_planes', plane)
         log.debug("{}, {} reference plane added with a length of"
                   .format(position, plane_type, length))
 
@@ -591,8 +900,15 @@ class GeometryProject(Project):
         message = "the name 'lossless' is reserved for the default Sonnet lossless metal"
         assert name != 'lossless', message
         # determine the pattern id and set the location string
-        metals = self['geometry']['metals'].splitlines()
-        pattern_id = len(metals) - 2
+        geometry = self['geometry']
+        metals = geometry['metals']
+        # the first two lines are the top and bottom box covers
+        defined_names = [shlex.split(defined_metal)[1] for defined_metal in metals[2:]]
+        # a redefined metal keeps its pattern id
+        if name in defined_names:
+            pattern_id = defined_names.index(name)
+        else:
+            pattern_id = len(defined_names)
         location = "MET"
         # format the new metal
         if metal_type == 'normal':
@@ -606,9 +922,9 @@ class GeometryProject(Project):
             r_rf = kwargs.pop('r_rf', 0)
             x_dc = kwargs.pop('x_dc', 0)
             ls = kwargs.pop('ls', 0)
-            metal = b.GENERAL_METAL_FORMAT.format(location=location, name=name,
-                                                  pattern_id=pattern_id, r_dc=r_dc,
-                                                  r_rf=r_rf, x_dc=x_dc, ls=ls)
+            metal = b.FORMATTERS[b.GENERAL_METAL_FORMAT](
+                {'location': location, 'name': name, 'pattern_id': pattern_id,
+                 'r_dc': r_dc, 'r_rf': r_rf, 'x_dc': x_dc, 'ls': ls})
         elif metal_type == 'sense':
             raise NotImplementedError
         elif metal_type == 'thick metal':
@@ -628,18 +944,12 @@ class GeometryProject(Project):
             message = "'metal_type' must be one of {}".format(metal_types)
             raise ValueError(message)
         # add the new metal to the metals list replacing if needed
-        defined_metals = metals[2:]
-        defined_names = []
-        for defined_metal in defined_metals:
-            defined_names.append(shlex.split(defined_metal)[1])
-        if name in defined_names:
-            metal_index = np.where(name == np.array(defined_names))[0][0]
-            metals[metal_index] = metal
+        if pattern_id < len(defined_names):
+            metals[pattern_id + 2] = metal
         else:
             metals.append(metal)
         # add the metal definitions to the geometry
-        metals = os.linesep.join(metals)
-        self['geometry']['metals'] = metals
+        geometry['metals'] = metals
         log.debug("{} {} metal defined".format(metal_type, name))
 
     def set_box_cover(self, cover_type, top=False, bottom=False, **kwargs):
@@ -666,7 +976,8 @@ class GeometryProject(Project):
         location_index = 0 if top else 1
         run_again = True if top and bottom else False
         # pull out all the metals
-        metals = self['geometry']['metals'].splitlines()
+        geometry = self['geometry']
+        metals = geometry['metals']
         # format metal string
         if cover_type == 'waveguide load':
             metal = b.WG_LOAD_FORMAT.format(location=location)
@@ -700,8 +1011,7 @@ class GeometryProject(Project):
             raise ValueError(message)
         # add the metal definition to the geometry
         metals[location_index] = metal
-        metals = os.linesep.join(metals)
-        self['geometry']['metals'] = metals
+        geometry['metals'] = metals
         log.debug("{} box cover added on the {}"
                   .format(cover_type, 'top' if top else 'bottom'))
         # run again if setting both top and bottom
@@ -754,8 +1064,9 @@ class GeometryProject(Project):
         dielectric_loss = anisotropic['dielectric_loss']
         magnetic_loss = anisotropic['magnetic_loss']
         conductivity = anisotropic['conductivity']
+        geometry = self['geometry']
         # get the current layers
-        layers = self['geometry']['layers'].splitlines()
+        layers = geometry['layers'].splitlines()
         # add some unnamed layers if the level we are adding larger than the current size
         if level >= len(layers):
             unnamed = b.LAYER_FORMAT.format(name="Unnamed", thickness=0, xy_epsilon=1,
@@ -765,7 +1076,7 @@ class GeometryProject(Project):
                                             z_sigma="", anisotropic="")
             layers += [unnamed] * (level + 1 - len(layers))
         # add the new number of metal levels to the project
-        self['geometry']['n_metal_levels'] = len(layers) - 1
+        geometry['n_metal_levels'] = len(layers) - 1
         # define xy layer parameters
         parameters = {'name': name, 'thickness': thickness, 'z_partitions': z_partitions,
                       'xy_epsilon': epsilon[0], 'xy_mu': mu[0],
@@ -790,7 +1101,7 @@ class GeometryProject(Project):
         layers[level] = b.LAYER_FORMAT.format(**parameters)
         # add the new dielectric layer to the geometry
         layers = os.linesep.join(layers)
-        self['geometry']['layers'] = layers
+        geometry['layers'] = layers
         log.debug("{} dielectric added at level {}".format(name, level))
 
     def add_variable(self, box_size_x=False, box_size_y=False):
@@ -811,14 +1122,15 @@ class GeometryProject(Project):
         :param y_cells: number of cells in the y direction (integer)
         :param symmetry: enable symmetry (boolean)
         """
-        self['geometry']['box_width_x'] = float(box_width_x)
-        self['geometry']['box_width_y'] = float(box_width_y)
+        geometry = self['geometry']
+        geometry['box_width_x'] = float(box_width_x)
+        geometry['box_width_y'] = float(box_width_y)
         log.debug("box size set to ({}, {})".format(box_width_x, box_width_y))
-        self['geometry']['x_cells2'] = 2 * int(x_cells)
-        self['geometry']['y_cells2'] = 2 * int(y_cells)
+        geometry['x_cells2'] = 2 * int(x_cells)
+        geometry['y_cells2'] = 2 * int(y_cells)
         log.debug("number of cells set to ({}, {})".format(int(x_cells), int(y_cells)))
         if symmetry:
-            self['geometry']['symmetry'] = 'SYM'
+            geometry['symmetry'] = 'SYM'
             log.debug("symmetry enabled")
 
     def define_dielectric_bricks(self):
@@ -879,8 +1191,7 @@ class GeometryProject(Project):
             if material == "lossless":
                 material_index = -1
             else:
-                metals = self['geometry']['metals'].splitlines()
-                defined_metals = metals[2:]
+                defined_metals = self['geometry']['metals'][2:]
                 defined_names = []
                 for defined_metal in defined_metals:
                     defined_names.append(shlex.split(defined_metal)[1])
@@ -996,10 +1307,11 @@ class GeometryProject(Project):
         assert port_type in b.PORT_TYPES.keys(), message.format(list(b.PORT_TYPES.keys()))
         message = "'number' parameter can not be 0 and must be an integer"
         assert isinstance(number, int) and number != 0, message
+        geometry = self['geometry']
         if port_type == "standard":
             independent = kwargs.pop("independent", False)
-            on_wall = (x == 0 or y == 0 or x == self["geometry"]["box_width_x"] or
-                       y == self["geometry"]["box_width_y"])
+            on_wall = (x == 0 or y == 0 or x == geometry["box_width_x"] or
+                       y == geometry["box_width_y"])
             message = "a standard port must be on the box wall to be independent"
             assert (independent and on_wall) or not independent, message
         elif port_type == "auto-grounded":
@@ -1009,14 +1321,14 @@ class GeometryProject(Project):
         else:  # co-calibrated
             independent = kwargs.pop("independent", False)
         # count the number of ports already made
-        ports = ['POR1' + c for c in self['geometry']['ports'].split('POR1') if c]
+        ports = ['POR1' + c for c in geometry['ports'].split('POR1') if c]
         n_ports = len(ports)
         # get all the file_ids from the ports
         file_ids = []
         for port in ports:
             file_ids.append(port.split("POLY")[1].split()[0])
         # find the right polygon and vertex
-        polygons = [c + "END" for c in self['geometry']['polygons'].split("END\n")
+        polygons = [c + "END" for c in geometry['polygons'].split("END\n")
                     if c.strip()]
         min_value = np.inf
         min_index = 0
@@ -1057,7 +1369,7 @@ class GeometryProject(Project):
             polygon = os.linesep.join(polygon)
             polygons[polygon_index] = polygon
             polygons = os.linesep.join(polygons)
-            self['geometry']['polygons'] = polygons
+            geometry['polygons'] = polygons
         else:
             file_id = level[4]
         # set the port format string
@@ -1080,7 +1392,7 @@ class GeometryProject(Project):
                        "ref_type": reference_type, "length": length_string,
                        "file_id": file_id, "polygon_index": min_index,
                        "x": new_position[0], "y": new_position[1]}
-        self['geometry']['ports'] += b.PORT_FORMAT.format(**port_format)
+        geometry['ports'] += b.PORT_FORMAT.format(**port_format)
         log.debug("{} port {} added at ({}, {}) with parameters ({}, {}, {}, {})"
                   .format(port_type, number, new_position[0], new_position[1], resistance,
                           reactance, inductance, capacitance))
@@ -1208,6 +1520,7 @@ class GeometryProject(Project):
                         "y_max": kwargs.pop("y_max", 100),
                         "conformal_max": kwargs.pop("conformal_max", 0),
                         "edge_mesh": "Y" if kwargs.pop("edge_mesh", True) else "N"}
+        geometry = self['geometry']
         name = kwargs.pop("material", "lossless")
         condition = (name == 'lossless' and (polygon_type == 'metal' or
                                              polygon_type == 'via') or
@@ -1215,7 +1528,7 @@ class GeometryProject(Project):
         if condition:
             metal_index = -1
         else:
-            defined_metals = self['geometry']['metals'].splitlines()[2:]
+            defined_metals = geometry['metals'][2:]
             defined_names = []
             for defined_metal in defined_metals:
                 defined_names.append(shlex.split(defined_metal)[1])
@@ -1266,8 +1579,8 @@ class GeometryProject(Project):
                 polygon_type=b.POLYGON_TYPES[polygon_type], level=level_string,
                 to_level=to_level_string, tech_layer=tech_layer_string,
                 polygon=polygon_string)
-            self['geometry']['polygons'] += polygons_string
-            self['geometry']['n_polygons'] += 1
+            geometry['polygons'] += polygons_string
+            geometry['n_polygons'] += 1
             log.debug("polygon added")
 
     def add_output_file(self, file_type, output_folder=None, deembed=True,
@@ -1296,21 +1609,13 @@ class GeometryProject(Project):
             real-imaginary.
         """
         # check inputs
-        file_types = {'touchstone': 'TS', 'ts': 'TS',
-                      'touchstone2': 'TOUCH2', 'touch2': 'TOUCH2',
-                      'databank': 'DATA_BANK', 'data_bank': 'DATA_BANK',
-                      'scompact': 'SC', 'sc': 'SC',
-                      'spreadsheet': 'CSV', 'csv': 'CSV',
-                      'cadance': 'CADANCE',
-                      'mdif_s2p': 'MDIF', 'mdif': 'MDIF',
-                      'mdif_ebridge': 'EBMDIF', 'ebmdif': 'EBMDIF'}
-        message = "'file_type' parameter must be in {}".format(list(file_types.keys()))
-        assert file_type in file_types.keys(), message
-        file_type = file_types[file_type.lower()]
-        message = "'parameter_type' parameter must be in {}".format(['S', 'Y', 'Z'])
-        assert parameter_type in ['S', 'Y', 'Z'], message
-        message = "'parameter_form' parameter must be in {}".format(['RI', 'MA', 'DB'])
-        assert parameter_form in ['RI', 'MA', 'DB'], message
+        message = "'file_type' parameter must be in {}"
+        assert file_type in b.FILE_TYPES, message.format(list(b.FILE_TYPES.keys()))
+        file_type = b.FILE_TYPES[file_type.lower()]
+        message = "'parameter_type' parameter must be in {}"
+        assert parameter_type in b.PARAMETER_TYPES, message.format(['S', 'Y', 'Z'])
+        message = "'parameter_form' parameter must be in {}"
+        assert parameter_form in b.PARAMETER_FORMS, message.format(['RI', 'MA', 'DB'])
         # parse options
         deembed = 'D' if deembed else 'ND'
         include_abs = 'Y' if include_abs else 'N'
@@ -1346,17 +1651,13 @@ class GeometryProject(Project):
         if output_folder is not None:
             self['output_file']['output_folder'] = output_folder
         # create output string
-        output = b.RESPONSE_DATA_FORMAT.format(file_type=file_type,
-                                               deembed=deembed,
-                                               include_abs=include_abs,
-                                               file_name=file_name,
-                                               include_comments=include_comments,
-                                               precision=precision,
-                                               parameter_type=parameter_type,
-                                               parameter_form=parameter_form,
-                                               ports=port_string)
+        output = b.FORMATTERS[b.RESPONSE_DATA_FORMAT](
+            {'file_type': file_type, 'deembed': deembed, 'include_abs': include_abs,
+             'file_name': file_name, 'include_comments': include_comments,
+             'precision': precision, 'parameter_type': parameter_type,
+             'parameter_form': parameter_form, 'ports': port_string})
         # add the output file to the project
-        self['output_file']['response_data'] += output + os.linesep
+        self._add_line('output_file', 'response_data', output)
         log.debug("{} output file added here '{}'".format(file_type, output_folder))
 
 
@@ -1364,24 +1665,23 @@ class NetlistProject(Project):
     """
     Class for creating and manipulating a Sonnet netlist project.
     """
+    __slots__ = ()
+    # file blocks in the order they are written and the section that formats each
+    file_blocks = ((b.NETLIST_PROJECT, 'sonnet'), (b.HEADER, 'sonnet'),
+                   (b.DIMENSIONS, 'dimensions'), (b.FREQUENCY, 'frequency'),
+                   (b.CONTROL, 'control'), (b.OPTIMIZATION, 'optimization'),
+                   (b.PARAMETER_SWEEP, 'parameter_sweep'), (b.OUTPUT_FILE, 'output_file'),
+                   (b.PARAMETER_NETLIST, 'parameter_netlist'), (b.CIRCUIT, 'circuit'),
+                   (b.QUICK_START_GUIDE, 'quick_start_guide'),
+                   (b.COMPONENT_DATA_FILES, 'component_data_files'),
+                   (b.TRANSLATORS, 'translators'))
+
     # convert the project format to the file format
     def make_sonnet_file(self, file_path):
-        file_string = (b.NETLIST_PROJECT.format(**self['sonnet']) +
-                       b.HEADER.format(**self['sonnet']) +
-                       b.DIMENSIONS.format(**self['dimensions']) +
-                       b.FREQUENCY.format(**self['frequency']) +
-                       b.CONTROL.format(**self['control']) +
-                       b.OPTIMIZATION.format(**self['optimization']) +
-                       b.PARAMETER_SWEEP.format(**self['parameter_sweep']) +
-                       b.OUTPUT_FILE.format(**self['output_file']) +
-                       b.PARAMETER_NETLIST.format(**self['parameter_netlist']) +
-                       b.CIRCUIT.format(**self['circuit']) +
-                       b.QUICK_START_GUIDE.format(**self['quick_start_guide']) +
-                       b.COMPONENT_DATA_FILES.format(**self['component_data_files']) +
-                       b.TRANSLATORS.format(**self['translators']))
+        blocks = self._format_blocks()
         log.debug("saving netlist project to '{}'".format(file_path))
-        with open(file_path, "w") as file_handle:
-            file_handle.write(file_string)
+        with open(file_path, "w", buffering=_WRITE_BUFFER_SIZE) as file_handle:
+            file_handle.writelines(blocks)
         self.project_file_path = file_path
         folder = os.path.join(os.path.dirname(self.project_file_path), 'sondata')
         if not os.path.isdir(folder):
@@ -22,6 +22,7 @@ setup(name='pysonnet',
       packages=find_packages(),
       install_requires=['numpy', 'scipy', 'matplotlib', 'pytest', 'pyyaml',
                         'psutil'],
+      extras_require={'fast': ['pandas', 'numba']},
       zip_safe=False,
       include_package_data=True,
       package_data={'': ['*.yaml']},)
@@ -104,9 +104,40 @@ def test_y_position(current_density):
 
 def test_current_density(current_density):
     assert current_density.current_density().shape == (2820, 265)
-    assert np.mean(current_density.current_density()) == 73295.98813106936
+    assert current_density.current_density().dtype == np.float32
+    assert (np.mean(current_density.current_density()) ==
+            pytest.approx(73295.98813106936, rel=1e-6))
     assert (np.mean(current_density.current_density(power=-23.2, impedance=23.3)) ==
-            1094.6446591536262)
+            pytest.approx(1094.6446591536262, rel=1e-6))
+
+
+def test_current_density_float64(current_density):
+    current_density = outputs.CurrentDensity(current_density.file_name,
+                                             dtype=np.float64)
+    assert current_density.current_density().dtype == np.float64
+    assert (np.mean(current_density.current_density()) ==
+            pytest.approx(73295.98813106936, rel=1e-12))
+
+
+def test_current_density_function(current_density):
+    function = current_density.current_density_function()
+    x = current_density.x_position[100:103]
+    y = current_density.y_position[1000:1004]
+    z = function(x, y)
+    assert z.shape == (4, 3)
+    assert np.allclose(z, current_density.current_density()[1000:1004, 100:103])
+    assert function(x[0] - 1000, y[0]) == 0
+    assert function(x[0], y[0]).shape == (1,)
+    assert function(x, y[0]).shape == (3,)
+    assert function(x[0], y).shape == (4, 1)
+    points = np.column_stack((y, y * 0 + x[0]))
+    assert np.allclose(function.interpolator(points),
+                       current_density.current_density()[1000:1004, 100])
+
+
+def test_current_density_function_unexpected_keyword(current_density):
+    with pytest.raises(TypeError):
+        current_density.current_density_function(method='cubic')
 
 
 def test_trim_data(current_density):
@@ -124,6 +155,37 @@ def test_plot_current(current_density):
     pyplot.close("all")
 
 
+@pytest.mark.skipif(outputs.njit is None, reason="numba is not installed")
+def test_compiled_parser(current_density):
+    compiled = outputs.CurrentDensity(current_density.file_name, compiled_parser=True)
+    assert np.array_equal(compiled.current_density(), current_density.current_density(),
+                          equal_nan=True)
+
+
+def test_cache(current_density, tmp_path):
+    file_name = str(tmp_path / "current.csv")
+    with open(current_density.file_name, 'rb') as source, open(file_name, 'wb') as f:
+        f.write(source.read())
+    cached = outputs.CurrentDensity(file_name, cache=True)
+    assert np.array_equal(cached.current_density(), current_density.current_density())
+    assert os.path.isfile(file_name + ".float32.npy")
+    cached = outputs.CurrentDensity(file_name, cache=True)
+    assert np.array_equal(cached.current_density(), current_density.current_density())
+    assert isinstance(cached._data, np.memmap)
+
+
+def test_cache_dtype(current_density, tmp_path):
+    file_name = str(tmp_path / "current.csv")
+    with open(current_density.file_name, 'rb') as source, open(file_name, 'wb') as f:
+        f.write(source.read())
+    outputs.CurrentDensity(file_name, cache=True).current_density()
+    cached = outputs.CurrentDensity(file_name, cache=True, dtype=np.float64)
+    parsed = outputs.CurrentDensity(current_density.file_name, dtype=np.float64)
+    assert cached.current_density().dtype == np.float64
+    assert np.array_equal(cached.current_density(), parsed.current_density())
+    assert os.path.isfile(file_name + ".float64.npy")
+
+
 def test_copy(current_density):
     copy = current_density.copy()
     assert copy is not current_density
@@ -132,3 +194,32 @@ def test_copy(current_density):
 def test_deepcopy(current_density):
     deepcopy = current_density.deepcopy()
     assert deepcopy is not current_density
+
+
+def parse_values(strings):
+    """Parses the strings as one row of a current density file with the compiled parser"""
+    text = "," * len(strings) + "\n" + ",".join(strings) + ",\n"
+    return outputs._parse_grid(np.frombuffer(text.encode(), dtype=np.uint8),
+                               np.float32)[-1]
+
+
+@pytest.mark.skipif(outputs.njit is None, reason="numba is not installed")
+def test_parse_fuzz():
+    rng = np.random.default_rng(0)
+    values = (rng.standard_normal(2000) * 10.0 ** rng.integers(-50, 40, 2000)).tolist()
+    strings = ([repr(value) for value in values] + ["%.6e" % value for value in values] +
+               ["%.9f" % value for value in values[:200]])
+    with np.errstate(over='ignore'):
+        expected = np.array([np.float32(float(string)) for string in strings])
+    assert np.array_equal(parse_values(strings), expected)
+
+
+@pytest.mark.skipif(outputs.njit is None, reason="numba is not installed")
+def test_parse_edge_cases():
+    strings = ["0.0000000000000000000001234", "000000000000000000001.5", "-0", "0e999",
+               "1.7976931348623157e308", "2.2250738585072014e-308", "1e-320", "1e-46",
+               "1e39", "-1e400", "1.401298464324817e-45", "3.4028235677973366e38"]
+    with np.errstate(over='ignore'):
+        expected = np.array([np.float32(float(string)) for string in strings])
+    assert np.array_equal(parse_values(strings), expected)
+    assert np.signbit(parse_values(["-0"])[0])
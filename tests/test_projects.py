@@ -0,0 +1,185 @@
+import os
+import copy
+import logging
+import subprocess
+import pytest
+from pysonnet import projects
+
+
+@pytest.fixture
+def geometry_project():
+    """Returns a GeometryProject using the default configuration"""
+    project = projects.GeometryProject()
+    project.set_options()
+    return project
+
+
+def make_file(project, directory, name="project.son"):
+    """Makes the Sonnet file for the project and returns its contents"""
+    file_path = os.path.join(str(directory), name)
+    project.make_sonnet_file(file_path)
+    with open(file_path) as file_handle:
+        return file_handle.read()
+
+
+def test_make_sonnet_file_section_changed(geometry_project, tmp_path):
+    first = make_file(geometry_project, tmp_path, "first.son")
+    geometry_project.setup_box(1000, 500, 200, 100)
+    second = make_file(geometry_project, tmp_path, "second.son")
+    assert first != second
+    assert "BOX 1 1000.0 500.0 400 200" in second
+
+
+def test_make_sonnet_file_metals_edited_in_place(geometry_project, tmp_path):
+    make_file(geometry_project, tmp_path, "first.son")
+    metal = 'MET "niobium" 0 SUP 0 0 0 0.1'
+    geometry_project['geometry']['metals'].append(metal)
+    assert metal in make_file(geometry_project, tmp_path, "second.son")
+
+
+@pytest.mark.parametrize("text, cached", [("a: {b: 1}\n", True),
+                                          ("a: {date: 2021-01-01}\n", False),
+                                          ("a: {1: b}\n", False)])
+def test_read_package_configuration(tmp_path, text, cached):
+    path = tmp_path / "configuration.yaml"
+    path.write_text(text)
+    for _ in range(2):
+        configuration = projects._read_package_configuration(str(path), os.stat(path))
+        assert configuration == projects.yaml.safe_load(text)
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        ["configuration.yaml"] + (["configuration.json"] if cached else []))
+
+
+@pytest.mark.parametrize("copy_function", [copy.copy, copy.deepcopy])
+def test_copy(geometry_project, tmp_path, copy_function):
+    original = make_file(geometry_project, tmp_path, "original.son")
+    project = copy_function(geometry_project)
+    assert type(project) is type(geometry_project)
+    assert project == geometry_project
+    project.setup_box(1000, 500, 200, 100)
+    project['geometry']['metals'].append('MET "niobium" 0 SUP 0 0 0 0.1')
+    assert make_file(geometry_project, tmp_path, "original.son") == original
+    assert make_file(project, tmp_path, "copy.son") != original
+
+
+def test_line_entries_save_and_load(geometry_project, tmp_path):
+    geometry_project.add_frequency_sweep('single', f1=1)
+    geometry_project.add_frequency_sweep('single', f1=2)
+    geometry_project.add_reference_plane('left', length=10)
+    original = make_file(geometry_project, tmp_path, "original.son")
+    assert "STEP 1\nSTEP 2\n\nEND FREQ" in original.replace(os.linesep, "\n")
+    path = str(tmp_path / "project.yaml")
+    geometry_project.save(path)
+    project = projects.GeometryProject(path)
+    assert project['frequency']['sweeps'] == ['STEP 1', 'STEP 2']
+    assert make_file(project, tmp_path, "loaded.son") == original
+    # configurations saved with the lines joined into one string still load
+    for section, keys in project.line_entries.items():
+        for key in keys:
+            project[section][key] = "".join(line + os.linesep
+                                            for line in project[section][key])
+    project.save(path)
+    assert make_file(projects.GeometryProject(path), tmp_path, "loaded.son") == original
+
+
+@pytest.mark.parametrize("sweep_type, kwargs, sweep", [
+    ('list', {'frequency_list': [1, 2.5, 3e9]}, 'LIST 1 2.5 3000000000.0'),
+    ('dc', {}, 'DC_FREQ AUTO '),
+    ('dc', {'f1': 3}, 'DC_FREQ MAN 3')])
+def test_add_frequency_sweep(geometry_project, sweep_type, kwargs, sweep):
+    geometry_project.add_frequency_sweep(sweep_type, **kwargs)
+    assert geometry_project['frequency']['sweeps'] == [sweep]
+
+
+@pytest.mark.parametrize("frequency_list", [[1, [2, 3]], [[1, 2], [3]], [1, 'a'],
+                                            [[1, 2], [3, 4]]])
+def test_add_frequency_sweep_bad_list(geometry_project, frequency_list):
+    with pytest.raises(AssertionError, match="must be a float"):
+        geometry_project.add_frequency_sweep('list', frequency_list=frequency_list)
+
+
+def test_read_configuration_cache(geometry_project, tmp_path):
+    path = str(tmp_path / "project.yaml")
+    geometry_project.save(path)
+    projects.GeometryProject(path)
+    assert os.path.abspath(path) not in projects._configuration_cache
+    assert projects._DEFAULT_LOAD_PATH in projects._configuration_cache
+
+
+def test_line_entries_set_as_string(geometry_project, tmp_path):
+    geometry_project.add_frequency_sweep('single', f1=1)
+    geometry_project.add_reference_plane('left', length=10)
+    original = make_file(geometry_project, tmp_path, "original.son")
+    for section, keys in geometry_project.line_entries.items():
+        for key in keys:
+            geometry_project[section][key] = "".join(
+                line + "\n" for line in geometry_project[section][key])
+    assert make_file(geometry_project, tmp_path, "string.son") == original
+    geometry_project.add_frequency_sweep('single', f1=2)
+    assert geometry_project['frequency']['sweeps'] == ['STEP 1', 'STEP 2']
+
+
+class _Process:
+    """Stands in for the em process and records the arguments it was started with"""
+    calls = []
+
+    def __init__(self, command, **kwargs):
+        self.calls.append((command, kwargs))
+        self.stdout = iter([])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def wait(self):
+        return 0
+
+
+@pytest.fixture
+def runnable_project(geometry_project, tmp_path):
+    """Returns a GeometryProject with a frequency sweep that is ready to run"""
+    geometry_project.add_frequency_sweep('single', f1=1)
+    geometry_project.set_analysis('frequency sweep')
+    geometry_project.make_sonnet_file(str(tmp_path / "project.son"))
+    return geometry_project
+
+
+@pytest.mark.parametrize("options, arguments", [("-v -N", ["-v", "-N"]),
+                                                (["-v", "-N"], ["-v", "-N"]),
+                                                ("", []), (None, [])])
+def test_run_command(runnable_project, monkeypatch, options, arguments):
+    monkeypatch.setattr(projects.psutil, "Popen", _Process)
+    _Process.calls.clear()
+    for sonnet_path in ("first", "second"):
+        runnable_project['sonnet']['sonnet_path'] = sonnet_path
+        runnable_project.run(options=options)
+    assert [command for command, _ in _Process.calls] == [
+        [os.path.join(sonnet_path, "bin", "em")] + arguments +
+        [runnable_project.project_file_path] for sonnet_path in ("first", "second")]
+
+
+def test_run_output_discarded(runnable_project, monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger=projects.__name__)
+    monkeypatch.setattr(projects.psutil, "Popen", _Process)
+    _Process.calls.clear()
+    runnable_project['sonnet']['sonnet_path'] = "sonnet"
+    runnable_project.run()
+    _, kwargs = _Process.calls[0]
+    assert kwargs['stdout'] is subprocess.DEVNULL
+    assert kwargs['stderr'] is subprocess.DEVNULL
+
+
+@pytest.mark.skipif(os.name == 'nt', reason="em is stood in for by a shell script")
+def test_run_output_logged(runnable_project, tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger=projects.__name__)
+    em_path = tmp_path / "sonnet" / "bin" / "em"
+    em_path.parent.mkdir(parents=True)
+    em_path.write_text("#!/bin/sh\necho 'em output'\necho 'em error' >&2\n")
+    em_path.chmod(0o755)
+    runnable_project['sonnet']['sonnet_path'] = str(tmp_path / "sonnet")
+    runnable_project.run()
+    messages = [record.getMessage() for record in caplog.records
+                if record.levelno == logging.INFO]
+    assert messages == ['em output', 'em error']